@@ -0,0 +1,9 @@
+import io
+from pathlib import Path
+
+
+def save_docx(doc, output_path: Path):
+    """Serialize the document in memory and write it to disk in one call."""
+    buf = io.BytesIO()
+    doc.save(buf)
+    output_path.write_bytes(buf.getvalue())
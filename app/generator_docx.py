@@ -4,6 +4,7 @@ from docx import Document
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from app.docx_utils import save_docx
 from app.models import ExtractedData
 
 
@@ -184,7 +185,7 @@ def generate_docx(data: ExtractedData, output_path: Path) -> Path:
     _add_field(doc, "Total Assessment Duration", data.summary.total_assessment_duration)
     _add_field(doc, "Mode of Training", data.summary.mode_of_training)
 
-    doc.save(str(output_path))
+    save_docx(doc, output_path)
     return output_path
 
 
@@ -349,5 +350,5 @@ def generate_audit_report(
     _add_field(doc, "Total Assessment Duration", data.summary.total_assessment_duration)
     _add_field(doc, "Mode of Training", data.summary.mode_of_training)
 
-    doc.save(str(output_path))
+    save_docx(doc, output_path)
     return output_path
@@ -1,130 +1,42 @@
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-
+from app.docx_utils import save_docx
+from app.lesson_plan_schedule import build_schedule, extract_overview, group_by_day
 from app.models import ExtractedData
 
-HEADING_COLOR = RGBColor(0x44, 0x72, 0xC4)  # Steel blue matching PDF template
-DAY_START_MINUTES = 9 * 60  # 9:00 AM in minutes from midnight
-LUNCH_DURATION = 60  # 1 hour lunch
-DAY_TOTAL_MINUTES = 480  # 8 hours of usable time (9 AM to 6 PM minus 1h lunch)
+# python-docx is imported inside the functions below so importing this module
+# does not pull in python-docx/lxml until a .docx is actually generated.
+HEADING_COLOR = (0x44, 0x72, 0xC4)  # Steel blue matching PDF template
 
 
-def _fmt_time(minutes_from_midnight: int) -> str:
-    """Format minutes from midnight as clock time (e.g. 540 -> '9:00', 800 -> '1:20')."""
-    h = minutes_from_midnight // 60
-    m = minutes_from_midnight % 60
-    # Use 12-hour display without AM/PM (matching PDF template style)
-    if h > 12:
-        h -= 12
-    elif h == 0:
-        h = 12
-    return f"{h}:{m:02d}"
+@lru_cache(maxsize=1)
+def _header_shading():
+    """Header cell fill, parsed once and copied into each header cell."""
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    return parse_xml(f'<w:shd {nsdecls("w")} w:fill="4472C4" w:val="clear"/>')
 
 
-def _build_schedule(data: ExtractedData) -> dict[int, list[dict]]:
-    """Build a per-day schedule of time slots from extracted data.
+def _add_colored_heading(doc, text: str, level: int = 2):
+    """Add a heading with the steel blue color matching the PDF template.
 
-    Returns {day_num: [{"start": str, "end": str, "label": str}, ...]}.
+    The color is set once on the document's heading style for this level,
+    so individual runs carry no color formatting.
     """
-    # Group topics by day
-    topics_by_day: dict[int, list] = {}
-    for lo in data.learning_outcomes:
-        topics_by_day.setdefault(lo.day, []).append(lo)
-
-    # Group assessment by day
-    assess_by_day: dict[int, int] = {}
-    for am in data.assessment_modes:
-        assess_by_day[am.day] = assess_by_day.get(am.day, 0) + am.duration_minutes
-
-    num_days = max(topics_by_day.keys()) if topics_by_day else 1
-    schedule: dict[int, list[dict]] = {}
-
-    for day in range(1, num_days + 1):
-        slots: list[dict] = []
-        topics = topics_by_day.get(day, [])
-        assess_min = assess_by_day.get(day, 0)
-
-        # Available instruction time = total day minus assessment
-        instruction_min = DAY_TOTAL_MINUTES - assess_min
-        num_topics = len(topics)
-        per_topic = instruction_min // num_topics if num_topics else 0
-
-        current = DAY_START_MINUTES
-        lunch_inserted = False
-
-        for topic in topics:
-            # Insert lunch if we've crossed ~1:00 PM and haven't yet
-            if not lunch_inserted and current >= 13 * 60 - 10:
-                lunch_end = current + LUNCH_DURATION
-                slots.append({
-                    "start": _fmt_time(current),
-                    "end": _fmt_time(lunch_end),
-                    "label": "Lunch Break",
-                })
-                current = lunch_end
-                lunch_inserted = True
-
-            end = current + per_topic
-            # Strip the topic prefix (e.g. "T1: ...") is already in the topic string
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(end),
-                "label": topic.topic,
-            })
-            current = end
-
-        # Insert lunch after last topic if not yet (unlikely but safe)
-        if not lunch_inserted and assess_min > 0:
-            lunch_end = current + LUNCH_DURATION
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(lunch_end),
-                "label": "Lunch Break",
-            })
-            current = lunch_end
-
-        # Assessment slot at end of day
-        if assess_min > 0:
-            end = current + assess_min
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(end),
-                "label": "Assessment",
-            })
-
-        schedule[day] = slots
-
-    return schedule
-
-
-def _extract_overview(data: ExtractedData) -> str:
-    """Extract a concise course overview paragraph from about_course text."""
-    text = data.particulars.about_course
-    # Find first substantive paragraph (skip section headers like "a. Benefits...")
-    for para in text.split("\n"):
-        stripped = para.strip()
-        if not stripped:
-            continue
-        # Skip section header lines (e.g. "a. Benefits of the Course...")
-        if len(stripped) < 80:
-            continue
-        if stripped.startswith("- "):
-            continue
-        return stripped
-    return text[:500]
-
-
-def _add_colored_heading(doc, text: str, level: int = 2):
-    """Add a heading with the steel blue color matching the PDF template."""
-    heading = doc.add_heading(text, level=level)
-    for run in heading.runs:
-        run.font.color.rgb = HEADING_COLOR
+    from docx.shared import RGBColor
+    color = RGBColor(*HEADING_COLOR)
+    font = doc.styles[f"Heading {level}"].font
+    if font.color.rgb != color:
+        font.color.rgb = color
+    doc.add_heading(text, level=level)
 
 
 def generate_lesson_plan(data: ExtractedData, output_path: Path) -> Path:
+    from docx import Document
+    from docx.shared import Pt
+
     doc = Document()
 
     # Configure default style
@@ -141,8 +53,10 @@ def generate_lesson_plan(data: ExtractedData, output_path: Path) -> Path:
     title_run.font.name = "Calibri"
 
     # --- Metadata lines ---
-    num_days = max(lo.day for lo in data.learning_outcomes) if data.learning_outcomes else 1
-    unique_methods = list(dict.fromkeys(im.method for im in data.instruction_methods))
+    groupings = group_by_day(data)
+    num_days = groupings.num_days
+    # Lowercase before de-duplicating so "Lecture" and "lecture" count once
+    unique_methods = dict.fromkeys(im.method.lower() for im in data.instruction_methods)
 
     # Parse hours from summary strings like "14 hour 0 minutes"
     training_hours = data.summary.total_instructional_duration
@@ -152,7 +66,7 @@ def generate_lesson_plan(data: ExtractedData, output_path: Path) -> Path:
         f"Course Duration: {num_days} Days (9:00 AM \u2013 6:00 PM daily)",
         f"Total Training Hours: {training_hours} (excluding lunch breaks)",
         f"Total Assessment Hours: {assessment_hours}",
-        f"Instructional Methods: {', '.join(m.lower() for m in unique_methods)}",
+        f"Instructional Methods: {', '.join(unique_methods)}",
     ]
     for line in metadata_lines:
         p = doc.add_paragraph(line)
@@ -160,24 +74,27 @@ def generate_lesson_plan(data: ExtractedData, output_path: Path) -> Path:
 
     # --- Course Overview ---
     _add_colored_heading(doc, "Course Overview")
-    overview_text = _extract_overview(data)
+    overview_text = extract_overview(data)
     doc.add_paragraph(overview_text)
 
     # --- Day schedules ---
-    schedule = _build_schedule(data)
+    schedule = build_schedule(data, groupings)
 
     for day_num in sorted(schedule.keys()):
         _add_colored_heading(doc, f"Day {day_num}")
-        for slot in schedule[day_num]:
-            slot_text = f"{slot['start']} \u2013 {slot['end']} | {slot['label']}"
-            doc.add_paragraph(slot_text)
+        # One paragraph per day; python-docx turns "\n" into line breaks
+        doc.add_paragraph("\n".join(
+            f"{slot.start} \u2013 {slot.end} | {slot.label}" for slot in schedule[day_num]
+        ))
 
-    doc.save(str(output_path))
+    save_docx(doc, output_path)
     return output_path
 
 
 def _set_header_cell(cell, text: str):
-    from docx.oxml.ns import qn
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt, RGBColor
+
     cell.text = ""
     p = cell.paragraphs[0]
     run = p.add_run(text)
@@ -186,10 +103,7 @@ def _set_header_cell(cell, text: str):
     run.font.color.rgb = RGBColor(255, 255, 255)
     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
     shading = cell._element.get_or_add_tcPr()
-    shading_elem = shading.makeelement(
-        qn("w:shd"), {qn("w:fill"): "4472C4", qn("w:val"): "clear"},
-    )
-    shading.append(shading_elem)
+    shading.append(deepcopy(_header_shading()))
 
 
 def generate_lesson_plan_table(
@@ -202,6 +116,9 @@ def generate_lesson_plan_table(
     instructional_methods: list[str] | None = None,
 ) -> Path:
     """Generate a lesson plan .docx with 4-column table (Timing, Duration, Description, Methods)."""
+    from docx import Document
+    from docx.shared import Inches, Pt
+
     doc = Document()
 
     style = doc.styles["Normal"]
@@ -227,9 +144,6 @@ def generate_lesson_plan_table(
     ]
     for line in metadata:
         p = doc.add_paragraph(line)
-        for run in p.runs:
-            run.font.name = "Arial"
-            run.font.size = Pt(11)
         p.paragraph_format.space_after = Pt(2)
 
     # Day tables
@@ -247,24 +161,19 @@ def generate_lesson_plan_table(
         table.columns[2].width = Inches(2.0)
         table.columns[3].width = Inches(2.3)
 
-        _set_header_cell(table.rows[0].cells[0], "Timing")
-        _set_header_cell(table.rows[0].cells[1], "Duration")
-        _set_header_cell(table.rows[0].cells[2], "Description")
-        _set_header_cell(table.rows[0].cells[3], "Instructional Methods")
+        header_cells = table.rows[0].cells
+        for cell, text in zip(header_cells, ("Timing", "Duration", "Description", "Instructional Methods")):
+            _set_header_cell(cell, text)
 
-        col_widths = [Inches(1.3), Inches(0.9), Inches(2.0), Inches(2.3)]
         for row_data in rows:
-            row = table.add_row()
-            for j, key in enumerate(("timing", "duration", "description", "methods")):
-                cell = row.cells[j]
-                cell.width = col_widths[j]
-                cell.text = ""
-                p = cell.paragraphs[0]
-                run = p.add_run(row_data.get(key, ""))
-                run.font.name = "Arial"
-                run.font.size = Pt(11)
+            # New rows already hold one empty paragraph per cell; fill it directly
+            # and fetch row.cells once (python-docx rebuilds it on every access)
+            cells = table.add_row().cells
+            # Runs inherit Arial 11pt from the Normal style configured above
+            for cell, key in zip(cells, ("timing", "duration", "description", "methods")):
+                cell.paragraphs[0].add_run(row_data.get(key, ""))
 
         doc.add_paragraph()
 
-    doc.save(str(output_path))
+    save_docx(doc, output_path)
     return output_path
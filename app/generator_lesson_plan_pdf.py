@@ -1,7 +1,7 @@
+from functools import lru_cache
 from pathlib import Path
 
-from fpdf import FPDF
-
+from app.lesson_plan_schedule import build_schedule, extract_overview, group_by_day
 from app.models import ExtractedData
 
 HEADING_COLOR = (68, 114, 196)  # Steel blue matching DOCX template
@@ -11,107 +11,17 @@ _UNICODE_REPLACEMENTS = {
     "\u201c": '"', "\u201d": '"',  # smart double quotes
     "\u2026": "...",               # ellipsis
 }
-DAY_START_MINUTES = 9 * 60
-LUNCH_DURATION = 60
-DAY_TOTAL_MINUTES = 480
+_UNICODE_TRANSLATION = str.maketrans(_UNICODE_REPLACEMENTS)
 
 
+@lru_cache(maxsize=256)
 def _sanitize(text: str) -> str:
-    for char, replacement in _UNICODE_REPLACEMENTS.items():
-        text = text.replace(char, replacement)
-    return text
-
-
-def _fmt_time(minutes_from_midnight: int) -> str:
-    h = minutes_from_midnight // 60
-    m = minutes_from_midnight % 60
-    if h > 12:
-        h -= 12
-    elif h == 0:
-        h = 12
-    return f"{h}:{m:02d}"
-
-
-def _build_schedule(data: ExtractedData) -> dict[int, list[dict]]:
-    topics_by_day: dict[int, list] = {}
-    for lo in data.learning_outcomes:
-        topics_by_day.setdefault(lo.day, []).append(lo)
-
-    assess_by_day: dict[int, int] = {}
-    for am in data.assessment_modes:
-        assess_by_day[am.day] = assess_by_day.get(am.day, 0) + am.duration_minutes
-
-    num_days = max(topics_by_day.keys()) if topics_by_day else 1
-    schedule: dict[int, list[dict]] = {}
-
-    for day in range(1, num_days + 1):
-        slots: list[dict] = []
-        topics = topics_by_day.get(day, [])
-        assess_min = assess_by_day.get(day, 0)
-
-        instruction_min = DAY_TOTAL_MINUTES - assess_min
-        num_topics = len(topics)
-        per_topic = instruction_min // num_topics if num_topics else 0
-
-        current = DAY_START_MINUTES
-        lunch_inserted = False
-
-        for topic in topics:
-            if not lunch_inserted and current >= 13 * 60 - 10:
-                lunch_end = current + LUNCH_DURATION
-                slots.append({
-                    "start": _fmt_time(current),
-                    "end": _fmt_time(lunch_end),
-                    "label": "Lunch Break",
-                })
-                current = lunch_end
-                lunch_inserted = True
-
-            end = current + per_topic
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(end),
-                "label": topic.topic,
-            })
-            current = end
-
-        if not lunch_inserted and assess_min > 0:
-            lunch_end = current + LUNCH_DURATION
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(lunch_end),
-                "label": "Lunch Break",
-            })
-            current = lunch_end
-
-        if assess_min > 0:
-            end = current + assess_min
-            slots.append({
-                "start": _fmt_time(current),
-                "end": _fmt_time(end),
-                "label": "Assessment",
-            })
-
-        schedule[day] = slots
-
-    return schedule
-
-
-def _extract_overview(data: ExtractedData) -> str:
-    text = data.particulars.about_course
-    for para in text.split("\n"):
-        stripped = para.strip()
-        if not stripped:
-            continue
-        if len(stripped) < 80:
-            continue
-        if stripped.startswith("- "):
-            continue
-        return stripped
-    return text[:500]
+    return text.translate(_UNICODE_TRANSLATION)
 
 
 def generate_lesson_plan_pdf(data: ExtractedData, output_path: Path) -> Path:
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=20)
     pdf.add_page()
@@ -122,8 +32,10 @@ def generate_lesson_plan_pdf(data: ExtractedData, output_path: Path) -> Path:
     pdf.ln(4)
 
     # --- Metadata ---
-    num_days = max(lo.day for lo in data.learning_outcomes) if data.learning_outcomes else 1
-    unique_methods = list(dict.fromkeys(im.method for im in data.instruction_methods))
+    groupings = group_by_day(data)
+    num_days = groupings.num_days
+    # Lowercase before de-duplicating so "Lecture" and "lecture" count once
+    unique_methods = dict.fromkeys(im.method.lower() for im in data.instruction_methods)
 
     training_hours = data.summary.total_instructional_duration
     assessment_hours = data.summary.total_assessment_duration
@@ -133,10 +45,9 @@ def generate_lesson_plan_pdf(data: ExtractedData, output_path: Path) -> Path:
         f"Course Duration: {num_days} Days (9:00 AM \u2013 6:00 PM daily)",
         f"Total Training Hours: {training_hours} (excluding lunch breaks)",
         f"Total Assessment Hours: {assessment_hours}",
-        f"Instructional Methods: {', '.join(m.lower() for m in unique_methods)}",
+        f"Instructional Methods: {', '.join(unique_methods)}",
     ]
-    for line in metadata_lines:
-        pdf.cell(0, 6, _sanitize(line), new_x="LMARGIN", new_y="NEXT")
+    pdf.multi_cell(0, 6, _sanitize("\n".join(metadata_lines)), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(6)
 
     # --- Course Overview ---
@@ -147,12 +58,12 @@ def generate_lesson_plan_pdf(data: ExtractedData, output_path: Path) -> Path:
     pdf.ln(2)
 
     pdf.set_font("Helvetica", "", 10)
-    overview_text = _extract_overview(data)
+    overview_text = extract_overview(data)
     pdf.multi_cell(0, 5, _sanitize(overview_text))
     pdf.ln(4)
 
     # --- Day schedules ---
-    schedule = _build_schedule(data)
+    schedule = build_schedule(data, groupings)
 
     for day_num in sorted(schedule.keys()):
         pdf.set_font("Helvetica", "B", 13)
@@ -162,12 +73,11 @@ def generate_lesson_plan_pdf(data: ExtractedData, output_path: Path) -> Path:
         pdf.ln(2)
 
         pdf.set_font("Helvetica", "", 10)
-        for slot in schedule[day_num]:
-            slot_text = f"{slot['start']} - {slot['end']}  |  {slot['label']}"
-            pdf.cell(0, 6, _sanitize(slot_text), new_x="LMARGIN", new_y="NEXT")
+        slot_text = "\n".join(f"{slot.start} - {slot.end}  |  {slot.label}" for slot in schedule[day_num])
+        pdf.multi_cell(0, 6, _sanitize(slot_text), new_x="LMARGIN", new_y="NEXT")
         pdf.ln(4)
 
-    pdf.output(str(output_path))
+    output_path.write_bytes(pdf.output())
     return output_path
 
 
@@ -184,7 +94,7 @@ def generate_lesson_plan_pdf_table(
 
     Uses Helvetica (PDF equivalent of Arial), 11pt body / 14pt title.
     """
-    from fpdf.enums import TableBordersLayout
+    from fpdf import FPDF
     from fpdf.fonts import FontFace
 
     pdf = FPDF()
@@ -206,14 +116,22 @@ def generate_lesson_plan_pdf_table(
         f"Total Assessment Hours: {assessment_hrs} hrs",
         f"Instructional Methods: {methods_text}",
     ]
-    for line in meta:
-        pdf.multi_cell(0, 6, _sanitize(line), new_x="LMARGIN", new_y="NEXT")
+    pdf.multi_cell(0, 6, _sanitize("\n".join(meta)), new_x="LMARGIN", new_y="NEXT")
     pdf.ln(4)
 
     # Table styling
     col_widths = (30, 20, 75, 65)  # total 190mm = full A4 usable width
     heading_style = FontFace(emphasis="BOLD", color=(255, 255, 255), fill_color=(68, 114, 196))
 
+    # Sanitize every cell once up front so the render loop only lays out text
+    clean_schedule = {
+        day_num: [
+            tuple(_sanitize(row_data.get(key, "")) for key in ("timing", "duration", "description", "methods"))
+            for row_data in rows
+        ]
+        for day_num, rows in schedule.items()
+    }
+
     for day_num in sorted(schedule.keys()):
         # Day heading
         pdf.set_font("Helvetica", "BU", 12)
@@ -240,14 +158,12 @@ def generate_lesson_plan_pdf_table(
             header.cell("Instructional Methods")
 
             # Data rows
-            for row_data in schedule[day_num]:
+            for row_cells in clean_schedule[day_num]:
                 row = table.row()
-                row.cell(_sanitize(row_data["timing"]))
-                row.cell(_sanitize(row_data["duration"]))
-                row.cell(_sanitize(row_data["description"]))
-                row.cell(_sanitize(row_data.get("methods", "")))
+                for text in row_cells:
+                    row.cell(text)
 
         pdf.ln(4)
 
-    pdf.output(str(output_path))
+    output_path.write_bytes(pdf.output())
     return output_path
@@ -0,0 +1,127 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.models import ExtractedData
+
+DAY_START_MINUTES = 9 * 60  # 9:00 AM in minutes from midnight
+LUNCH_DURATION = 60  # 1 hour lunch
+DAY_TOTAL_MINUTES = 480  # 8 hours of usable time (9 AM to 6 PM minus 1h lunch)
+
+_LINE_RE = re.compile(r"[^\n]+")
+
+class DayGroupings(NamedTuple):
+    """Learning outcomes and assessment minutes grouped by day (see group_by_day)."""
+
+    topics_by_day: dict[int, list]
+    assess_by_day: dict[int, int]
+    num_days: int
+
+
+class Slot(NamedTuple):
+    """One timed row in a day schedule (clock strings from fmt_time)."""
+
+    start: str
+    end: str
+    label: str
+
+
+@lru_cache(maxsize=24 * 60)
+def fmt_time(minutes_from_midnight: int) -> str:
+    """Format minutes from midnight as clock time (e.g. 540 -> '9:00', 800 -> '1:20')."""
+    h, m = divmod(minutes_from_midnight, 60)
+    # Use 12-hour display without AM/PM (matching PDF template style)
+    h = (h - 1) % 12 + 1
+    return f"{h}:{m:02d}"
+
+
+def group_by_day(data: ExtractedData) -> DayGroupings:
+    """Group topics and assessment minutes by day.
+
+    Generators call this once and reuse the result for both the day count and
+    build_schedule, instead of scanning the learning outcomes twice.
+    """
+    # Group topics by day
+    topics_by_day: dict[int, list] = defaultdict(list)
+    for lo in data.learning_outcomes:
+        topics_by_day[lo.day].append(lo)
+
+    # Group assessment by day
+    assess_by_day: dict[int, int] = defaultdict(int)
+    for am in data.assessment_modes:
+        assess_by_day[am.day] += am.duration_minutes
+
+    num_days = max(topics_by_day.keys()) if topics_by_day else 1
+    return DayGroupings(topics_by_day, assess_by_day, num_days)
+
+
+def build_schedule(
+    data: ExtractedData,
+    groupings: DayGroupings | None = None,
+) -> dict[int, list[Slot]]:
+    """Build a per-day schedule of time slots from extracted data.
+
+    Returns {day_num: [Slot(start, end, label), ...]}.
+    """
+    topics_by_day, assess_by_day, num_days = groupings or group_by_day(data)
+    schedule: dict[int, list[Slot]] = {}
+
+    for day in range(1, num_days + 1):
+        slots: list[Slot] = []
+        topics = topics_by_day.get(day, [])
+        assess_min = assess_by_day.get(day, 0)
+
+        # Available instruction time = total day minus assessment
+        instruction_min = DAY_TOTAL_MINUTES - assess_min
+        num_topics = len(topics)
+        per_topic = instruction_min // num_topics if num_topics else 0
+
+        current = DAY_START_MINUTES
+        lunch_inserted = False
+
+        for topic in topics:
+            # Insert lunch if we've crossed ~1:00 PM and haven't yet
+            if not lunch_inserted and current >= 13 * 60 - 10:
+                lunch_end = current + LUNCH_DURATION
+                slots.append(Slot(fmt_time(current), fmt_time(lunch_end), "Lunch Break"))
+                current = lunch_end
+                lunch_inserted = True
+
+            end = current + per_topic
+            # Strip the topic prefix (e.g. "T1: ...") is already in the topic string
+            slots.append(Slot(fmt_time(current), fmt_time(end), topic.topic))
+            current = end
+
+        # Insert lunch after last topic if not yet (unlikely but safe)
+        if not lunch_inserted and assess_min > 0:
+            lunch_end = current + LUNCH_DURATION
+            slots.append(Slot(fmt_time(current), fmt_time(lunch_end), "Lunch Break"))
+            current = lunch_end
+
+        # Assessment slot at end of day
+        if assess_min > 0:
+            end = current + assess_min
+            slots.append(Slot(fmt_time(current), fmt_time(end), "Assessment"))
+
+        schedule[day] = slots
+
+    return schedule
+
+
+def extract_overview(data: ExtractedData) -> str:
+    """Extract a concise course overview paragraph from about_course text."""
+    text = data.particulars.about_course
+    # Find first substantive paragraph (skip section headers like "a. Benefits...");
+    # lines are matched lazily so nothing past the first hit is allocated
+    for match in _LINE_RE.finditer(text):
+        stripped = match.group().strip()
+        if not stripped:
+            continue
+        # Skip section header lines (e.g. "a. Benefits of the Course...")
+        if len(stripped) < 80:
+            continue
+        if stripped.startswith("- "):
+            continue
+        return stripped
+    return text[:500]
@@ -40,7 +40,6 @@ from app.ai_generator import (
     generate_what_youll_learn,
 )
 from app.extractor import extract_data
-from app.generator_docx import generate_audit_report
 from app.generator_lesson_plan import generate_lesson_plan_table
 from app.generator_lesson_plan_pdf import generate_lesson_plan_pdf_table
 
@@ -1574,6 +1573,9 @@ elif active_page == "CP Quality Audit":
                 if st.button("Generate Audit Report", type="primary", use_container_width=True, key="audit_report_btn"):
                     with st.spinner("Generating audit report..."):
                         try:
+                            # Imported here so python-docx only loads once a report is requested
+                            from app.generator_docx import generate_audit_report
+
                             with tempfile.TemporaryDirectory() as tmp_dir:
                                 report_path = Path(tmp_dir) / "CP_Audit_Report.docx"
                                 generate_audit_report(